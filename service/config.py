@@ -4,16 +4,20 @@ Global Configuration for Application
 import os
 
 
-# Get configuration from environment
-DATABASE_URI = os.getenv("DATABASE_URI")
+def database_uri_from_env():
+    """Returns DATABASE_URI, or builds one from the DATABASE_* variables"""
+    database_uri = os.getenv("DATABASE_URI")
+    if database_uri:
+        return database_uri
+    database_user = os.getenv("DATABASE_USER", "postgres")
+    database_password = os.getenv("DATABASE_PASSWORD", "postgres")
+    database_name = os.getenv("DATABASE_NAME", "postgres")
+    database_host = os.getenv("DATABASE_HOST", "localhost")
+    return f"postgresql://{database_user}:{database_password}@{database_host}:5432/{database_name}"
+
 
-# Build DATABASE_URI from environment if not found
-if not DATABASE_URI:
-    DATABASE_USER = os.getenv("DATABASE_USER", "postgres")
-    DATABASE_PASSWORD = os.getenv("DATABASE_PASSWORD", "postgres")
-    DATABASE_NAME = os.getenv("DATABASE_NAME", "postgres")
-    DATABASE_HOST = os.getenv("DATABASE_HOST", "localhost")
-    DATABASE_URI = f"postgresql://{DATABASE_USER}:{DATABASE_PASSWORD}@{DATABASE_HOST}:5432/{DATABASE_NAME}"
+# Get configuration from environment
+DATABASE_URI = database_uri_from_env()
 
 # Configure SQLAlchemy
 SQLALCHEMY_DATABASE_URI = DATABASE_URI
@@ -0,0 +1,183 @@
+"""
+Shared pytest fixtures for the Account Service test suite
+
+Set TEST_FAST=1 to run against an in-memory SQLite database instead of
+PostgreSQL:
+  TEST_FAST=1 pytest
+
+Under pytest-xdist each worker uses its own database named after the
+configured one plus the worker id (e.g. postgres_gw0). They are created
+on first use, emptied at the start of every session and left in place
+afterwards; drop them by hand if they are no longer wanted.
+"""
+import os
+import logging
+import importlib.util
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.pool import NullPool, StaticPool
+
+HTTPS_ENVIRON = {'wsgi.url_scheme': 'https'}
+MEMORY_URI = "sqlite:///:memory:"
+
+
+######################################################################
+#  H E L P E R   F U N C T I O N S
+######################################################################
+def _create_database(url):
+    """Creates the PostgreSQL database named in url if it does not exist"""
+    engine = create_engine(
+        url.set(database="postgres"), isolation_level="AUTOCOMMIT"
+    )
+    with engine.connect() as connection:
+        exists = connection.execute(
+            text("SELECT 1 FROM pg_database WHERE datname = :name"),
+            {"name": url.database},
+        ).scalar()
+        if not exists:
+            connection.execute(text(f'CREATE DATABASE "{url.database}"'))
+    engine.dispose()
+
+
+def _load_service_config():
+    """Loads service/config.py without running service/__init__.py"""
+    path = os.path.join(os.path.dirname(__file__), os.pardir, "service", "config.py")
+    spec = importlib.util.spec_from_file_location("_service_config", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _use_worker_database():
+    """Points DATABASE_URI at a database that is private to this xdist worker"""
+    if os.getenv("TEST_FAST") == "1":
+        # each worker process gets its own in-memory database anyway
+        os.environ["DATABASE_URI"] = MEMORY_URI
+        return
+
+    worker = os.getenv("PYTEST_XDIST_WORKER")
+    if not worker:
+        return
+
+    url = make_url(_load_service_config().database_uri_from_env())
+    if url.database in (None, "", ":memory:"):
+        return
+
+    if url.get_backend_name() == "sqlite":
+        root, ext = os.path.splitext(url.database)
+        url = url.set(database=f"{root}_{worker}{ext}")
+    else:
+        url = url.set(database=f"{url.database}_{worker}")
+        _create_database(url)
+    os.environ["DATABASE_URI"] = url.render_as_string(hide_password=False)
+
+
+# Importing the service creates its tables, so every worker has to be
+# pointed at its own database before that happens
+_use_worker_database()
+
+# pylint: disable=wrong-import-position
+from service import app, talisman  # noqa: E402
+from service.config import DATABASE_URI  # noqa: E402
+from service.models import db, init_db, Account  # noqa: E402
+
+
+def _enable_sqlite_savepoints(engine):
+    """Lets pysqlite honor SAVEPOINTs by emitting BEGIN itself"""
+
+    @event.listens_for(engine, "connect")
+    def disable_pysqlite_transactions(dbapi_connection, connection_record):  # pylint: disable=unused-argument
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def emit_begin(connection):
+        connection.exec_driver_sql("BEGIN")
+
+    engine.dispose()  # drop connections opened before the listeners
+
+
+def _empty_tables():
+    """Removes rows left behind by anything other than the test suite"""
+    table = Account.__table__.name
+    if db.engine.dialect.name == "postgresql":
+        db.session.execute(text(f"TRUNCATE {table} RESTART IDENTITY CASCADE"))
+    else:
+        db.session.query(Account).delete()
+    db.session.commit()
+
+
+######################################################################
+#  F I X T U R E S
+######################################################################
+@pytest.fixture(scope="session")
+def database_uri():
+    """Returns the database URI that is private to this xdist worker"""
+    return DATABASE_URI
+
+
+@pytest.fixture(scope="session")
+def app_ctx(database_uri):
+    """Configures the app and creates the schema once per test session"""
+    # dispose the import-time engine before new options replace it
+    db.engine.dispose()
+    if database_uri == MEMORY_URI:
+        # an in-memory database only lives as long as its connection
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+            "poolclass": StaticPool,
+            "connect_args": {"check_same_thread": False},
+        }
+    else:
+        # every test checks out exactly one connection, so skip the pool
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {"poolclass": NullPool}
+    app.config["TESTING"] = True
+    app.config["DEBUG"] = False
+    app.config["SQLALCHEMY_DATABASE_URI"] = database_uri
+    app.logger.setLevel(logging.CRITICAL)
+    init_db(app)
+    if db.engine.dialect.name == "sqlite":
+        _enable_sqlite_savepoints(db.engine)
+        db.create_all()  # an in-memory schema goes away with its connection
+    _empty_tables()
+    talisman.force_https = False
+    yield app
+
+
+@pytest.fixture
+def client(app_ctx):
+    """Returns a test client that is closed when the test finishes"""
+    with app_ctx.test_client() as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="module")
+def home_https_response(app_ctx):
+    """Fetches the home page over HTTPS once per test module"""
+    with app_ctx.test_client() as test_client:
+        return test_client.get("/", environ_overrides=HTTPS_ENVIRON)
+
+
+@pytest.fixture
+def db_session(app_ctx):
+    """Runs each test inside a transaction that is rolled back afterwards"""
+    connection = db.engine.connect()
+    trans = connection.begin()
+    nested = connection.begin_nested()
+    app_session = db.session
+    db.session = scoped_session(sessionmaker(bind=connection, expire_on_commit=False))
+
+    @event.listens_for(db.session, "after_transaction_end")
+    def restart_savepoint(session, transaction):  # pylint: disable=unused-argument
+        """Opens a new SAVEPOINT each time the code under test commits"""
+        nonlocal nested
+        if not nested.is_active:
+            nested = connection.begin_nested()
+
+    yield db.session
+
+    event.remove(db.session, "after_transaction_end", restart_savepoint)
+    db.session.close()
+    db.session = app_session
+    trans.rollback()
+    connection.close()